@@ -60,6 +60,23 @@ let expectingPopup = null; // { url, expectedUrl, via, timestamp, fallbackTimerI
 let allowedRecordingTabs = new Set();
 let pendingExportAfterStop = null; // { sendResponse }
 
+// --- Recorder injection (lazy, only into allowed recording tabs) ---
+// Files that make up the full recorder; the manifest only loads content_bootstrap.js
+const RECORDER_SCRIPT_FILES = ["dnd_kit_enhancer.js", "content.js"];
+const workerStartedAt = Date.now();
+const injectionMetrics = {
+  workerStartedAt, // when this service worker instance started
+  stateLoadMs: null, // time spent restoring state from storage
+  injectedCount: 0, // successful full recorder injections
+  skippedCount: 0, // frames that already had the recorder loaded
+  failedCount: 0,
+  totalInjectMs: 0,
+  lastInjectMs: null,
+  recent: [], // [{ tabId, frameId, reason, ms, outcome, at }] (last 20)
+};
+const inFlightInjections = new Map(); // `${tabId}:${frameId}` -> Promise<boolean>
+let initialStateLoad = null; // Promise of the single loadState() run per worker instance
+
 // --- Service Worker state persistence ---
 async function saveState() {
   try {
@@ -85,6 +102,7 @@ async function saveState() {
 }
 
 async function loadState() {
+  const loadStart = Date.now();
   try {
     const data = await chrome.storage.local.get([
       "isRecording",
@@ -125,7 +143,7 @@ async function loadState() {
         recordedActions.length
       );
 
-      // If recording is active, ensure content script is re-injected and start periodic saving
+      // If recording is active, re-inject the recorder into allowed tabs and start periodic saving
       if (isRecording && recordingTabId) {
         console.log(
           "Background: Resuming recording state for tab",
@@ -136,7 +154,7 @@ async function loadState() {
         try {
           chrome.tabs.get(recordingTabId, (tab) => {
             if (!chrome.runtime.lastError && tab) {
-              ensureContentScriptInTab(recordingTabId);
+              injectIntoRecordingTabs();
             } else {
               // If recording tab no longer exists, reset state
               console.warn(
@@ -155,24 +173,33 @@ async function loadState() {
     }
   } catch (e) {
     console.warn("Background: Failed to load state:", e);
+  } finally {
+    injectionMetrics.stateLoadMs = Date.now() - loadStart;
   }
 }
 
+/**
+ * Load state once per service worker instance (top level, onStartup and onInstalled
+ * all share the same run, so a resumed recording is only re-injected once).
+ */
+function loadStateOnce() {
+  if (!initialStateLoad) initialStateLoad = loadState();
+  return initialStateLoad;
+}
+
 // Service Worker startup - restore state
 chrome.runtime.onStartup.addListener(async () => {
   console.log("Background: Service Worker starting up, loading state...");
-  await loadState();
+  await loadStateOnce();
 });
 
 chrome.runtime.onInstalled.addListener(async () => {
   console.log("Background: Extension installed/updated, loading state...");
-  await loadState();
-  // Inject into all existing tabs after installation
-  setTimeout(() => injectIntoAllTabs(), 1000);
+  await loadStateOnce();
 });
 
 // Load state during initialization (async)
-loadState()
+loadStateOnce()
   .then(() => {
     console.log("Background: Initial state load complete");
   })
@@ -3144,59 +3171,163 @@ function flushAllPendingInputs() {
 }
 
 /**
- * Ensure content.js is present in a tab using scripting.executeScript.
+ * Record timing of one recorder injection attempt (see get_injection_metrics).
  */
-async function ensureContentScriptInTab(tabId) {
-  // Ensure content.js is injected into specified tab
-  try {
-    if (!tabId) return;
-    await chrome.scripting.executeScript({
-      target: { tabId: tabId },
-      files: ["content.js"],
-    });
-    console.log(`Background: Injected content.js into tab ${tabId}`);
+function recordInjectionTiming(tabId, frameId, reason, ms, outcome) {
+  if (outcome === "injected") {
+    injectionMetrics.injectedCount++;
+    injectionMetrics.totalInjectMs += ms;
+    injectionMetrics.lastInjectMs = ms;
+  } else if (outcome === "skipped") {
+    injectionMetrics.skippedCount++;
+  } else {
+    injectionMetrics.failedCount++;
+  }
+  injectionMetrics.recent.push({
+    tabId,
+    frameId: frameId === undefined ? null : frameId,
+    reason,
+    ms,
+    outcome,
+    at: Date.now(),
+  });
+  if (injectionMetrics.recent.length > 20) injectionMetrics.recent.shift();
+}
 
-    // 如果正在錄製，發送 start_recording 命令啟動監聽器
-    if (isRecording) {
-      // 等待一下確保 content script 已經加載
-      await new Promise((r) => setTimeout(r, 100));
-      chrome.tabs
-        .sendMessage(tabId, { command: "start_recording" })
-        .then(() =>
-          console.log(`Background: Sent start_recording to tab ${tabId}`)
-        )
-        .catch((err) =>
-          console.warn(
-            `Background: Failed to send start_recording to tab ${tabId}:`,
-            err
-          )
-        );
+/**
+ * Inject the full recorder (dnd_kit_enhancer.js + content.js) into one frame.
+ * Concurrent calls for the same frame share one in-flight promise, and frames that
+ * already have the recorder are skipped (re-running dnd_kit_enhancer.js would
+ * redeclare its top-level consts).
+ * @param {number} tabId
+ * @param {number} frameId
+ * @param {string} [reason] why the injection was requested (for metrics)
+ * @returns {Promise<boolean>} true if the recorder is present after the call
+ */
+function injectRecorderIntoFrame(tabId, frameId, reason = "auto") {
+  const key = `${tabId}:${frameId}`;
+  const pending = inFlightInjections.get(key);
+  if (pending) return pending;
+
+  const promise = (async () => {
+    const target = { tabId, frameIds: [frameId] };
+    const start = Date.now();
+    try {
+      const probe = await chrome.scripting.executeScript({
+        target,
+        func: () => !!window.__SELBAS_CONTENT_SCRIPT_LOADED__,
+      });
+      if (probe && probe[0] && probe[0].result) {
+        recordInjectionTiming(tabId, frameId, reason, Date.now() - start, "skipped");
+        return true;
+      }
+      await chrome.scripting.executeScript({
+        target,
+        files: RECORDER_SCRIPT_FILES,
+      });
+      const ms = Date.now() - start;
+      recordInjectionTiming(tabId, frameId, reason, ms, "injected");
+      console.log(
+        `Background: Injected recorder into tab ${tabId}${
+          frameId ? ` frame ${frameId}` : ""
+        } in ${ms}ms (${reason})`
+      );
+      return true;
+    } catch (e) {
+      recordInjectionTiming(tabId, frameId, reason, Date.now() - start, "failed");
+      console.warn(
+        `Background: Failed to inject recorder into tab ${tabId} frame ${frameId}:`,
+        e && e.message ? e.message : e
+      );
+      return false;
+    } finally {
+      inFlightInjections.delete(key);
     }
-  } catch (e) {
-    console.warn(
-      `Background: Failed to inject content.js into tab ${tabId}:`,
-      e && e.message ? e.message : e
-    );
-  }
+  })();
+  inFlightInjections.set(key, promise);
+  return promise;
 }
 
 /**
- * Inject content.js into all existing tabs (used on startup/installation).
+ * Inject the full recorder into a tab. Without frameId every frame that lacks it is
+ * injected in parallel (covers iframes in tabs opened before install, which have no
+ * content_bootstrap.js); with frameId only that frame is touched.
+ * @param {number} tabId
+ * @param {number} [frameId]
+ * @param {string} [reason]
+ * @returns {Promise<boolean>} true if the recorder is present in the top (or given) frame
  */
-async function injectIntoAllTabs() {
-  // Try to inject into all existing tabs during install/startup
+async function injectRecorder(tabId, frameId, reason = "auto") {
+  if (frameId !== undefined)
+    return injectRecorderIntoFrame(tabId, frameId, reason);
+
+  let missingFrameIds = [0];
   try {
-    const tabs = await chrome.tabs.query({});
-    for (const t of tabs) {
-      if (!t.id || !t.url) continue;
-      await ensureContentScriptInTab(t.id);
+    const probe = await chrome.scripting.executeScript({
+      target: { tabId, allFrames: true },
+      func: () => !!window.__SELBAS_CONTENT_SCRIPT_LOADED__,
+    });
+    if (probe && probe.length) {
+      missingFrameIds = probe.filter((r) => !r.result).map((r) => r.frameId);
+      if (!missingFrameIds.length) return true;
     }
-    console.log(
-      "Background: Completed injecting content.js into existing tabs."
-    );
   } catch (e) {
-    console.warn("Background: injectIntoAllTabs error:", e);
+    // Fall back to the top frame only (its own injection reports the failure)
   }
+  const results = await Promise.all(
+    missingFrameIds.map((id) => injectRecorderIntoFrame(tabId, id, reason))
+  );
+  const topIndex = missingFrameIds.indexOf(0);
+  return topIndex === -1 ? true : results[topIndex];
+}
+
+/**
+ * Ensure the recorder is present in an allowed recording tab and start its listeners.
+ * Tabs outside allowedRecordingTabs only carry content_bootstrap.js and are left alone.
+ * @param {number} tabId
+ * @param {number} [frameId] limit injection (and start_recording) to one frame
+ * @param {string} [reason]
+ */
+async function ensureContentScriptInTab(tabId, frameId, reason = "auto") {
+  if (!tabId || !isRecording || !allowedRecordingTabs.has(tabId)) return false;
+  const ok = await injectRecorder(tabId, frameId, reason);
+  if (!ok) return false;
+
+  // 發送 start_recording 命令啟動監聽器 (等待一下確保 content script 已經加載)
+  await new Promise((r) => setTimeout(r, 100));
+  const options = frameId === undefined ? undefined : { frameId };
+  chrome.tabs
+    .sendMessage(tabId, { command: "start_recording" }, options)
+    .then(() =>
+      console.log(`Background: Sent start_recording to tab ${tabId}`)
+    )
+    .catch((err) =>
+      console.warn(
+        `Background: Failed to send start_recording to tab ${tabId}:`,
+        err
+      )
+    );
+  return true;
+}
+
+/**
+ * Inject the recorder into every allowed recording tab in parallel
+ * (used when a recording is resumed after a service worker restart).
+ */
+async function injectIntoRecordingTabs() {
+  const start = Date.now();
+  const tabIds = Array.from(allowedRecordingTabs);
+  const results = await Promise.allSettled(
+    tabIds.map((id) => ensureContentScriptInTab(id, undefined, "resume"))
+  );
+  const injected = results.filter(
+    (r) => r.status === "fulfilled" && r.value
+  ).length;
+  console.log(
+    `Background: Injected recorder into ${injected}/${tabIds.length} recording tabs in ${
+      Date.now() - start
+    }ms`
+  );
 }
 
 /**
@@ -3250,10 +3381,9 @@ chrome.runtime.onMessage.addListener((message, sender, sendResponse) => {
       // Ensure periodic saving is started
       startPeriodicStateSave();
 
-      chrome.scripting
-        .executeScript({
-          target: { tabId: recordingTabId },
-          files: ["content.js"],
+      injectRecorder(recordingTabId, undefined, "start_recording")
+        .then((ok) => {
+          if (!ok) throw new Error("Failed to inject recorder into tab.");
         })
         .then(() => new Promise((r) => setTimeout(r, 500)))
         .then(() => {
@@ -4310,6 +4440,41 @@ chrome.runtime.onMessage.addListener((message, sender, sendResponse) => {
       return true;
     }
 
+    case "load_recorder": {
+      // content_bootstrap.js asks for the full recorder (page load or start_recording broadcast)
+      const tabId = sender && sender.tab ? sender.tab.id : null;
+      const frameId = sender ? sender.frameId : undefined;
+      const reason = (message.data && message.data.reason) || "bootstrap";
+      // This message may have woken the worker: decide on restored state
+      loadStateOnce()
+        .then(() => ensureContentScriptInTab(tabId, frameId, reason))
+        .then((loaded) => sendResponse({ success: true, loaded }));
+      return true;
+    }
+
+    case "ensure_recorder": {
+      // Side panel needs the recorder outside of recording (e.g. element picker)
+      const { tabId } = message.data || {};
+      if (!tabId) {
+        sendResponse({ success: false, message: "Missing tabId." });
+        return true;
+      }
+      loadStateOnce()
+        .then(() => injectRecorder(tabId, undefined, "ensure_recorder"))
+        .then((ok) => sendResponse({ success: ok }));
+      return true;
+    }
+
+    case "get_injection_metrics": {
+      // Startup/injection timing for measurement
+      sendResponse({
+        ...injectionMetrics,
+        uptimeMs: Date.now() - workerStartedAt,
+        allowedRecordingTabs: Array.from(allowedRecordingTabs),
+      });
+      return true;
+    }
+
     case "get_recording_state": {
       // Get current recording state (actions and counts)
       sendResponse({
@@ -4600,6 +4765,8 @@ chrome.runtime.onMessage.addListener((message, sender, sendResponse) => {
                   try {
                     // allow this tab to record and capture screenshot
                     allowedRecordingTabs.add(t.id);
+                    // existing tab only has content_bootstrap.js; load the recorder before capturing
+                    await ensureContentScriptInTab(t.id);
                     await new Promise((r) => setTimeout(r, 150));
                     triggerScreenshot(t.id, { force: true }).catch(() => {});
                     // also request HTML capture in case it loaded immediately
@@ -4643,13 +4810,8 @@ chrome.tabs.onRemoved.addListener((tabId, removeInfo) => {
   if (pendingNewTabs[tabId]) delete pendingNewTabs[tabId];
 });
 
-// When tab load completes, ensure content.js injection; if pending new tab then capture
+// When tab load completes, capture it if it is a pending new tab (content_bootstrap.js requests the recorder)
 chrome.tabs.onUpdated.addListener((tabId, changeInfo, tab) => {
-  if (changeInfo.status === "complete") {
-    // Ensure content script is injected
-    ensureContentScriptInTab(tabId);
-  }
-
   // If this tab was marked pending (new popup/new tab), capture it when complete
   if (pendingNewTabs[tabId] && changeInfo.status === "complete") {
     (async () => {
@@ -4711,6 +4873,7 @@ chrome.tabs.onUpdated.addListener((tabId, changeInfo, tab) => {
                   .catch(() => {});
                 // Allow actions from this new tab (recording can continue inside popup)
                 allowedRecordingTabs.add(tabId);
+                ensureContentScriptInTab(tabId);
                 delete pendingNewTabs[tabId];
               }
             );
@@ -4734,6 +4897,7 @@ chrome.tabs.onUpdated.addListener((tabId, changeInfo, tab) => {
               .catch(() => {});
             // Allow actions from this new tab (recording can continue inside popup)
             allowedRecordingTabs.add(tabId);
+            ensureContentScriptInTab(tabId);
             delete pendingNewTabs[tabId];
           }
         });
@@ -4894,16 +5058,6 @@ chrome.windows.onCreated.addListener(async (win) => {
   }
 });
 
-// Installation/startup: attempt to inject into all existing tabs
-chrome.runtime.onInstalled.addListener(() => injectIntoAllTabs());
-if (chrome.runtime.onStartup)
-  chrome.runtime.onStartup.addListener(() => injectIntoAllTabs());
-
-// Safety measure: inject again when tab loading is complete (some pages only allow injection after loading)
-chrome.tabs.onUpdated.addListener((tabId, changeInfo, tab) => {
-  if (changeInfo.status === "complete") ensureContentScriptInTab(tabId);
-});
-
 // Track last recorded URL to detect navigation
 let lastRecordedURL = "";
 
@@ -0,0 +1,42 @@
+/**
+ * content_bootstrap.js
+ * Lightweight stub registered for every page/frame in manifest.json.
+ * The full recorder (dnd_kit_enhancer.js + content.js) is only injected by the background
+ * into tabs that are part of the current recording (allowedRecordingTabs); this stub asks
+ * for it on page load while a recording is active, or when a start_recording broadcast
+ * reaches a frame that does not have it yet.
+ */
+
+(function () {
+  if (window.__SELBAS_BOOTSTRAP_LOADED__) return;
+  window.__SELBAS_BOOTSTRAP_LOADED__ = true;
+
+  function requestRecorder(reason) {
+    // Background decides whether this tab/frame is allowed to record
+    if (window.__SELBAS_CONTENT_SCRIPT_LOADED__) return;
+    try {
+      chrome.runtime
+        .sendMessage({ command: "load_recorder", data: { reason } })
+        .catch(() => {});
+    } catch (e) {
+      /* extension context invalidated */
+    }
+  }
+
+  chrome.runtime.onMessage.addListener((message) => {
+    // No sendResponse here: content.js answers once it is loaded
+    if (message && message.command === "start_recording") {
+      requestRecorder("start_recording");
+    }
+  });
+
+  // Only wake the service worker when a recording is in progress
+  try {
+    chrome.storage.local.get(["isRecording"], (data) => {
+      if (chrome.runtime.lastError) return;
+      if (data && data.isRecording) requestRecorder("page_load");
+    });
+  } catch (e) {
+    /* ignore */
+  }
+})();
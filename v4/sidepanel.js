@@ -449,16 +449,8 @@ if (typeof window.sidePanelInitialized === "undefined") {
         "Click on the element you want to select on the page, or press ESC to cancel."
       );
 
-      // Get the current active tab
-      chrome.tabs.query({ active: true, currentWindow: true }, (tabs) => {
-        if (!tabs || tabs.length === 0) {
-          alert("Could not find active tab. Please try again.");
-          return;
-        }
-
-        const activeTabId = tabs[0].id;
-
-        // Send message to content script to start element picker
+      // Send message to content script to start element picker
+      const startElementPicker = (activeTabId) => {
         chrome.tabs.sendMessage(
           activeTabId,
           { command: "start_element_picker" },
@@ -507,6 +499,34 @@ if (typeof window.sidePanelInitialized === "undefined") {
             }
           }
         );
+      };
+
+      // Get the current active tab
+      chrome.tabs.query({ active: true, currentWindow: true }, (tabs) => {
+        if (!tabs || tabs.length === 0) {
+          alert("Could not find active tab. Please try again.");
+          return;
+        }
+
+        const activeTabId = tabs[0].id;
+
+        // Tabs only carry content_bootstrap.js until needed; load the recorder first
+        chrome.runtime.sendMessage(
+          { command: "ensure_recorder", data: { tabId: activeTabId } },
+          (resp) => {
+            if (chrome.runtime.lastError || !resp || !resp.success) {
+              console.error(
+                "Failed to load recorder into tab:",
+                chrome.runtime.lastError || (resp && resp.message)
+              );
+              alert(
+                "Could not load the recorder into this page (it may be a restricted page such as chrome://)."
+              );
+              return;
+            }
+            startElementPicker(activeTabId);
+          }
+        );
       });
 
       return; // Exit early as we're handling async